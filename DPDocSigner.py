@@ -1,21 +1,56 @@
 
-from cryptography.hazmat.primitives import hashes
+import hashlib
+import threading
 from text_matcher import separate_sentences
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Sequence
 from dataclasses import dataclass
 from functools import lru_cache
+from collections import OrderedDict
 
 DP_SEED_CONSTANT = "9ca57ab0545f346b422ebf7fe6be7b9a5e11f214a1e575bfc0db081f4b5fa0ec"
+HASH_CACHE_MAX_SIZE = 4096  # Entries kept by the base/content lru caches
+SIGNATURE_CACHE_MAX_SIZE = 8192  # Entries kept by the cumulative signature memo table
+SENTENCE_CACHE_MAX_SIZE = 256  # Pages whose sentence split is kept
+PAGE_SIGNATURE_CACHE_MAX_SIZE = 1024  # Final page signatures shared by all threads
+
+# Precomputed "step_<id>" labels for the cumulative step message; pages
+# rarely have more chunks than this, larger ids are formatted on demand
+_STEP_LABELS = tuple(f"step_{i}" for i in range(4096))
 
 @dataclass
 class SignatureStep:
     """Represents one step in the incremental signing process"""
+    __slots__ = ("step_id", "content_hash", "cumulative_signature", "dependencies", "metadata")
+
     step_id: int
     content_hash: str
     cumulative_signature: str
-    dependencies: List[int]  # Which previous steps this depends on
+    dependencies: Sequence[int]  # Which previous steps this depends on
     metadata: Dict
 
+# Hash memos shared by every signer. They are module-level functions rather
+# than lru_cache'd methods: a method cache keys on self, so it would keep
+# each thread's signer (and its sentence cache) alive after the thread exits.
+@lru_cache(maxsize=HASH_CACHE_MAX_SIZE)
+def _title_midstate(doc_title: str) -> "hashlib._Hash":
+    """
+    SHA-256 state after absorbing the "{doc_title}|" prefix shared by every
+    page of a document. Callers must .copy() it before updating.
+    """
+    return hashlib.sha256(f"{doc_title}|".encode('utf-8'))
+
+@lru_cache(maxsize=HASH_CACHE_MAX_SIZE)
+def _base_signature(doc_title: str, page_number: int, base_seed: str) -> str:
+    """Hash of f"{doc_title}|{page_number}|{base_seed}", from the title midstate."""
+    digest = _title_midstate(doc_title).copy()
+    digest.update(f"{page_number}|{base_seed}".encode('utf-8'))
+    return digest.hexdigest()
+
+@lru_cache(maxsize=HASH_CACHE_MAX_SIZE)
+def _content_signature(content: str) -> str:
+    """Hex SHA-256 of a content chunk."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 class DPDocumentSigner:
     """
     Dynamic Programming approach to incremental document signing.
@@ -24,30 +59,77 @@ class DPDocumentSigner:
     
     def __init__(self, base_seed: str = DP_SEED_CONSTANT):
         self.base_seed = base_seed
-        self.signature_cache: Dict[Tuple, str] = {}  # Memoization cache
-        self.step_signatures: Dict[int, SignatureStep] = {}  # Store all steps
+        self.signature_cache: "OrderedDict[Tuple, str]" = OrderedDict()  # Bounded LRU memoization cache
+        self.step_signatures: List[Optional[SignatureStep]] = []  # Steps indexed by step_id
+        self.sentence_cache: "OrderedDict[bytes, Tuple[Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()  # Page digest -> chunks, chunk hashes
         
+    def _get_step(self, step_id: int) -> Optional[SignatureStep]:
+        """Return the recorded step with this id, or None if there is none."""
+        if 0 <= step_id < len(self.step_signatures):
+            return self.step_signatures[step_id]
+        return None
+    
+    def _steps(self) -> List[SignatureStep]:
+        """Return the recorded steps in step_id order, skipping unused ids."""
+        return [step for step in self.step_signatures if step is not None]
+    
     def _hash_data(self, data: str) -> str:
         """Function to hash data with SHA-256"""
-        digest = hashes.Hash(hashes.SHA256())
-        digest.update(data.encode('utf-8'))
-        return digest.finalize().hex()
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
     
-    @lru_cache(maxsize=None)
     def _compute_base_signature(self, doc_title: str, page_number: int) -> str:
         """
         DP Base Case: Compute the foundational signature for a document page.
+        Equivalent to hashing f"{doc_title}|{page_number}|{base_seed}".
+        """
+        return _base_signature(doc_title, page_number, self.base_seed)
+
+    def _compute_page_content_signature(self, doc_title: str, page_number: int) -> str:
         """
-        base_data = f"{doc_title}|{page_number}|{self.base_seed}"
-        return self._hash_data(base_data)
+        Content signature of the "{doc_title}|{page_number}" base step,
+        finished from the cached title midstate.
+        """
+        digest = _title_midstate(doc_title).copy()
+        digest.update(str(page_number).encode('utf-8'))
+        return digest.hexdigest()
     
-    @lru_cache(maxsize=None)
     def _compute_content_signature(self, content: str) -> str:
         """
         DP Subproblem: Compute signature for content chunks.
         Memoized to handle repeated content patterns efficiently.
         """
-        return self._hash_data(content)
+        return _content_signature(content)
+
+    def _split_sentences(self, page_text: str,
+                         text_digest: Optional[bytes] = None) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Memoized separate_sentences, returning the chunks together with the
+        content signatures of the stripped chunks. Neither depends on the
+        title or page number, so a page text repeated anywhere (boilerplate,
+        re-verification) is split and hashed once. Entries are keyed by the
+        SHA-256 digest of the text, which may be passed as `text_digest`.
+        """
+        key = text_digest if text_digest is not None else hashlib.sha256(page_text.encode('utf-8')).digest()
+        entry = self.sentence_cache.get(key)
+        if entry is not None:
+            self.sentence_cache.move_to_end(key)
+            return entry
+        
+        chunks = tuple(separate_sentences(page_text))
+        entry = (chunks, tuple(self._compute_content_signatures([chunk.strip() for chunk in chunks])))
+        self.sentence_cache[key] = entry
+        if len(self.sentence_cache) > SENTENCE_CACHE_MAX_SIZE:
+            self.sentence_cache.popitem(last=False)
+        return entry
+
+    def _compute_content_signatures(self, contents: List[str]) -> List[str]:
+        """
+        Compute the content signatures for a batch of chunks in one pass.
+        Chunk hashes are independent of each other, so they can all be
+        computed up front before the sequential recurrence is reduced.
+        """
+        sha256 = hashlib.sha256
+        return [sha256(content.encode('utf-8')).hexdigest() for content in contents]
     
     def _compute_cumulative_signature(self, 
                                     content_sig: str, 
@@ -61,49 +143,77 @@ class DPDocumentSigner:
         """
         cache_key = (content_sig, previous_sigs, step_id)
         
-        if cache_key in self.signature_cache:
-            return self.signature_cache[cache_key]
-        
-        # Combine all dependent signatures
-        combined_previous = "|".join(previous_sigs) if previous_sigs else ""
+        signature = self.signature_cache.get(cache_key)
+        if signature is not None:
+            self.signature_cache.move_to_end(cache_key)
+            return signature
         
-        # Create cumulative signature
-        cumulative_data = f"{content_sig}|{combined_previous}|step_{step_id}"
-        signature = self._hash_data(cumulative_data)
+        # Create cumulative signature in a single join:
+        # content_sig|dep_sig_1|...|dep_sig_n|step_<id>, or content_sig||step_<id>
+        # when the step has no dependencies. This is the sequential critical
+        # path, so hash directly rather than going through _hash_data.
+        step_label = _STEP_LABELS[step_id] if 0 <= step_id < len(_STEP_LABELS) else f"step_{step_id}"
+        if previous_sigs:
+            cumulative_data = "|".join((content_sig, *previous_sigs, step_label))
+        else:
+            cumulative_data = f"{content_sig}||{step_label}"
+        signature = hashlib.sha256(cumulative_data.encode('utf-8')).hexdigest()
         
-        # Memoize result
+        # Memoize result, evicting the least recently used entry when full
         self.signature_cache[cache_key] = signature
+        if len(self.signature_cache) > SIGNATURE_CACHE_MAX_SIZE:
+            self.signature_cache.popitem(last=False)
         return signature
     
     def add_signing_step(self, 
                         step_id: int,
                         content: str,
-                        dependencies: List[int] = None,
-                        metadata: Dict = None) -> SignatureStep:
+                        dependencies: Sequence[int] = (),
+                        metadata: Dict = None,
+                        content_sig: str = None,
+                        retain_content: bool = False) -> SignatureStep:
         """
         DP Step Addition: Add a new step to the signing process.
         Each step depends on previous steps, creating the DP structure.
+        `content_sig` may be passed when the content hash was already
+        computed as part of a batch. The content itself is only kept in the
+        step metadata when `retain_content` is set.
         """
-        dependencies = dependencies or []
+        if step_id < 0:
+            raise ValueError(f"Step id must be non-negative, got {step_id}")
+        if dependencies is None:
+            dependencies = ()
         metadata = metadata or {}
         
-        # Store original content for verification
-        metadata["original_content"] = content
+        # Store original content for verification only when asked to
+        if retain_content:
+            metadata["original_content"] = content
         
         # Compute content signature (subproblem)
-        content_sig = self._compute_content_signature(content)
+        if content_sig is None:
+            content_sig = self._compute_content_signature(content)
         
-        # Gather signatures from dependencies
-        previous_sigs = []
-        for dep_id in dependencies:
-            if dep_id not in self.step_signatures:
-                raise ValueError(f"Dependency step {dep_id} not found")
-            previous_sigs.append(self.step_signatures[dep_id].cumulative_signature)
+        # Gather signatures from dependencies; the page chain only ever has
+        # zero or one, so those cases build the tuple directly
+        n_deps = len(dependencies)
+        if n_deps == 0:
+            previous_sigs = ()
+        elif n_deps == 1:
+            dep_step = self._get_step(dependencies[0])
+            if dep_step is None:
+                raise ValueError(f"Dependency step {dependencies[0]} not found")
+            previous_sigs = (dep_step.cumulative_signature,)
+        else:
+            dep_steps = [self._get_step(dep_id) for dep_id in dependencies]
+            for dep_id, dep_step in zip(dependencies, dep_steps):
+                if dep_step is None:
+                    raise ValueError(f"Dependency step {dep_id} not found")
+            previous_sigs = tuple(dep_step.cumulative_signature for dep_step in dep_steps)
         
         # Compute cumulative signature (recurrence relation)
         cumulative_sig = self._compute_cumulative_signature(
             content_sig, 
-            tuple(previous_sigs), 
+            previous_sigs, 
             step_id
         )
         
@@ -116,36 +226,71 @@ class DPDocumentSigner:
             metadata=metadata
         )
         
-        self.step_signatures[step_id] = step
+        # Ids are normally consecutive from 0; pad any gap left by sparse ids
+        steps = self.step_signatures
+        if step_id == len(steps):
+            steps.append(step)
+        else:
+            while len(steps) <= step_id:
+                steps.append(None)
+            steps[step_id] = step
         return step
     
-    def verify_signature_integrity(self, step_id: int) -> bool:
+    def verify_signature_integrity(self, step_id: int, content: Optional[str] = None) -> bool:
         """
         Verify the integrity of a signature step by recomputing it.
+        `content` is the step's content as freshly parsed by the caller; when
+        omitted, the content retained in the step metadata is used instead.
         """
-        if step_id not in self.step_signatures:
+        step = self._get_step(step_id)
+        if step is None:
             return False
         
-        step = self.step_signatures[step_id]
-        
         # Recompute content signature
-        original_content = step.metadata.get("original_content", "")
+        original_content = content if content is not None else step.metadata.get("original_content")
+        if original_content is None:
+            return False
         expected_content_sig = self._compute_content_signature(original_content)
         
         if step.content_hash != expected_content_sig:
             return False
         
+        return self._is_cumulative_signature_valid(step)
+
+    def verify_all_signature_integrity(self, contents: Dict[int, str]) -> Dict[int, bool]:
+        """
+        Verify every step at once. Content hashes are independent, so they are
+        recomputed as one batch; only the cumulative check walks the steps in order.
+        """
+        steps = self._steps()
+        available = [step.step_id for step in steps if contents.get(step.step_id) is not None]
+        expected_content_sigs = dict(zip(
+            available,
+            self._compute_content_signatures([contents[step_id] for step_id in available])
+        ))
+        
+        results = {}
+        for step in steps:
+            results[step.step_id] = (
+                step.content_hash == expected_content_sigs.get(step.step_id)
+                and self._is_cumulative_signature_valid(step)
+            )
+        return results
+
+    def _is_cumulative_signature_valid(self, step: SignatureStep) -> bool:
+        """Recompute a step's cumulative signature from its stored dependencies."""
         # Gather dependency signatures
         previous_sigs = []
         for dep_id in step.dependencies:
-            if dep_id in self.step_signatures:
-                previous_sigs.append(self.step_signatures[dep_id].cumulative_signature)
+            dep_step = self._get_step(dep_id)
+            if dep_step is not None:
+                previous_sigs.append(dep_step.cumulative_signature)
         
         # Recompute cumulative signature
         expected_cumulative = self._compute_cumulative_signature(
             step.content_hash,
             tuple(previous_sigs),
-            step_id
+            step.step_id
         )
         
         return step.cumulative_signature == expected_cumulative
@@ -156,8 +301,7 @@ class DPDocumentSigner:
         Useful for auditing and understanding the incremental process.
         """
         chain = []
-        for step_id in sorted(self.step_signatures.keys()):
-            step = self.step_signatures[step_id]
+        for step in self._steps():
             chain.append({
                 "step_id": step.step_id,
                 "content_hash": step.content_hash[:16] + "...",  # Truncated for display
@@ -168,19 +312,78 @@ class DPDocumentSigner:
         return chain
 
 
-def generate_dp_page_signature(page_text: str, doc_title: str, page_number: int) -> str:
+_thread_local = threading.local()
+
+def _get_signer() -> DPDocumentSigner:
+    """
+    Return the DPDocumentSigner owned by the calling thread, creating it on
+    first use. Signers are not thread-safe, so each thread gets its own, but
+    it is reused across pages so its memo caches carry over between them.
+    """
+    signer = getattr(_thread_local, "signer", None)
+    if signer is None:
+        signer = DPDocumentSigner()
+        _thread_local.signer = signer
+    return signer
+
+
+# Final signatures of recently signed pages, keyed by (text digest, title, page
+# number) since the signature depends on all three. This only serves signing or
+# verifying the same page again; the same text on another page or in another
+# document is served by the signer's sentence cache instead.
+_page_signature_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+_page_signature_lock = threading.Lock()
+
+def _chain_page_signature(base_content_sig: str, content_sigs: Sequence[str]) -> str:
+    """
+    Run the page's DP recurrence in a single loop. Produces the same final
+    signature as chaining add_signing_step calls, without building the
+    per-step records the audit helpers need.
+    """
+    sha256 = hashlib.sha256
+    labels = _STEP_LABELS
+    signature = sha256(f"{base_content_sig}||step_0".encode('utf-8')).hexdigest()
+    for step_id, content_sig in enumerate(content_sigs, 1):
+        label = labels[step_id] if step_id < len(labels) else f"step_{step_id}"
+        signature = sha256(f"{content_sig}|{signature}|{label}".encode('utf-8')).hexdigest()
+    return signature
+
+
+def generate_dp_page_signature(page_text: str, doc_title: str, page_number: int,
+                               record_steps: bool = False) -> str:
     """
     Generates a page signature using True Dynamic Programming and Hashing.
     This replaces the original sequential approach with proper DP structure.
+    Pass record_steps=True to keep the per-step records for
+    get_dp_signature_details and verify_dp_signature_integrity.
     """
-    dp_signer = DPDocumentSigner() # changed to instance variable due to crashes in multi-threaded environments
+    dp_signer = _get_signer()
     
     if not page_text:
         # Handle empty page case
         empty_content = f"{doc_title}|{page_number}|EMPTY_PAGE_PLACEHOLDER"
         return dp_signer._compute_base_signature(doc_title, page_number)
     
-    # Clear previous steps for new document
+    if not record_steps:
+        text_digest = hashlib.sha256(page_text.encode('utf-8')).digest()
+        key = (text_digest, doc_title, page_number)
+        with _page_signature_lock:
+            signature = _page_signature_cache.get(key)
+            if signature is not None:
+                _page_signature_cache.move_to_end(key)
+                return signature
+        
+        _, content_sigs = dp_signer._split_sentences(page_text, text_digest)
+        signature = _chain_page_signature(
+            dp_signer._compute_page_content_signature(doc_title, page_number), content_sigs
+        )
+        with _page_signature_lock:
+            _page_signature_cache[key] = signature
+            if len(_page_signature_cache) > PAGE_SIGNATURE_CACHE_MAX_SIZE:
+                _page_signature_cache.popitem(last=False)
+        return signature
+    
+    # Clear the previous page's steps; step ids restart at 0 for every page
     dp_signer.step_signatures.clear()
     
     # Step 0: Base signature (DP base case)
@@ -188,26 +391,31 @@ def generate_dp_page_signature(page_text: str, doc_title: str, page_number: int)
     dp_signer.add_signing_step(
         step_id=0,
         content=base_content,
-        dependencies=[],
-        metadata={"type": "base", "doc_title": doc_title, "page": page_number}
+        dependencies=(),
+        metadata={"type": "base", "doc_title": doc_title, "page": page_number},
+        content_sig=dp_signer._compute_page_content_signature(doc_title, page_number)
     )
     
     # Break text into sentences/chunks
-    page_chunks = separate_sentences(page_text)
+    page_chunks, content_sigs = dp_signer._split_sentences(page_text)
     
     if not page_chunks:
         # If no chunks after processing, return base signature
         return dp_signer.step_signatures[0].cumulative_signature
     
+    # Every chunk was hashed up front; only the recurrence below is sequential
+    chunk_contents = [chunk.strip() for chunk in page_chunks]
+    
     # Step 1+: Process each chunk incrementally (DP recurrence)
     for i, chunk in enumerate(page_chunks, 1):
-        dependencies = [i-1]  # Each step depends on the previous one
+        dependencies = (i-1,)  # Each step depends on the previous one
         
         dp_signer.add_signing_step(
             step_id=i,
-            content=chunk.strip(),
+            content=chunk_contents[i-1],
             dependencies=dependencies,
-            metadata={"type": "content", "chunk_index": i-1, "chunk_text": chunk}
+            metadata={"type": "content", "chunk_index": i-1, "chunk_text": chunk},
+            content_sig=content_sigs[i-1]
         )
     
     # Return final cumulative signature
@@ -218,26 +426,34 @@ def get_dp_signature_details() -> Dict:
     """
     Get detailed information about the DP signature process.
     Useful for debugging and verification.
+    Reports on the last page the calling thread signed with record_steps=True.
     """
-    global dp_signer
+    dp_signer = _get_signer()
     return {
         "signature_chain": dp_signer.get_signature_chain(),
         "cache_size": len(dp_signer.signature_cache),
-        "total_steps": len(dp_signer.step_signatures),
+        "total_steps": len(dp_signer._steps()),
         "cache_stats": {
-            "base_signature_cache": dp_signer._compute_base_signature.cache_info(),
-            "content_signature_cache": dp_signer._compute_content_signature.cache_info()
+            "base_signature_cache": _base_signature.cache_info(),
+            "content_signature_cache": _content_signature.cache_info()
         }
     }
 
-def verify_dp_signature_integrity() -> Dict[int, bool]:
+def verify_dp_signature_integrity(contents: Optional[Dict[int, str]] = None) -> Dict[int, bool]:
     """
     Verify the integrity of all signature steps in the current document.
+    `contents` maps step_id to the step content; when omitted it is rebuilt
+    from the metadata recorded by generate_dp_page_signature.
     Returns a dictionary mapping step_id to verification result.
     """
-    global dp_signer
-    results = {}
-    for step_id in dp_signer.step_signatures:
-        results[step_id] = dp_signer.verify_signature_integrity(step_id)
-    return results
+    dp_signer = _get_signer()
+    if contents is None:
+        contents = {}
+        for step in dp_signer._steps():
+            step_id = step.step_id
+            if step.metadata.get("type") == "base":
+                contents[step_id] = f"{step.metadata['doc_title']}|{step.metadata['page']}"
+            elif "chunk_text" in step.metadata:
+                contents[step_id] = step.metadata["chunk_text"].strip()
+    return dp_signer.verify_all_signature_integrity(contents)
 
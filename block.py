@@ -1,10 +1,23 @@
 """Block class for the blockchain."""
 import hashlib
 import json
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
+
+# Fields serialized by Block.serialize_prefix; assigning any of them drops the cached prefix state
+_PREFIX_FIELDS = frozenset(('index', 'previous_hash', 'timestamp', 'version', 'data', 'signature'))
+# Fields covered by Block.calculate_hash; assigning any of them drops the cached hash
+_HASHED_FIELDS = _PREFIX_FIELDS | {'nonce'}
+# Fields written by Block.to_dict and read back by Block.from_dict
+_DICT_FIELDS = ('index', 'previous_hash', 'timestamp', 'version', 'data', 'signature', 'nonce', 'current_hash')
+_set_slot = object.__setattr__
 
 class Block:
+    __slots__ = ('index', 'previous_hash', 'timestamp', 'version', 'data', 'signature', 'nonce',
+                 'current_hash', '_prefix_state', '_hash')
+
     def __init__(self, index: int, previous_hash: str, timestamp: int, data: Union[Dict[str, Any], str], signature: str, nonce: int = 0) -> None:
+        self._prefix_state: Optional[Any] = None  # SHA-256 state after the serialized prefix
+        self._hash: Optional[str] = None  # Memoized calculate_hash() result
         self.index: int = index
         self.previous_hash: str = previous_hash
         self.timestamp: int = timestamp
@@ -14,8 +27,19 @@ class Block:
         self.nonce: int = nonce  # The nonce found by Proof of Work
         self.current_hash: str = None  # Initialize and set after PoW
 
-    def calculate_hash(self) -> str:
-        """Calculates the hash of the block's content."""
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _HASHED_FIELDS:
+            object.__setattr__(self, '_hash', None)
+            if name in _PREFIX_FIELDS:
+                object.__setattr__(self, '_prefix_state', None)
+        object.__setattr__(self, name, value)
+
+    def serialize_prefix(self) -> bytes:
+        """
+        Serializes the hashed block content that precedes the nonce. The nonce
+        is the only field that changes while mining, so the miner hashes this
+        prefix once and then only feeds in each nonce.
+        """
         # Ensure data (if a dict) is serialized consistently
         if isinstance(self.data, dict):
             data_str = json.dumps(self.data, sort_keys=True, separators=(',', ':'))
@@ -27,11 +51,36 @@ class Block:
                         str(self.timestamp) +
                         str(self.version) +
                         data_str +
-                        str(self.signature) +
-                        str(self.nonce))
-        
-        first_hash = hashlib.sha256(block_content.encode('utf-8')).digest()
-        double_hash = hashlib.sha256(first_hash).hexdigest()
+                        str(self.signature))
+        return block_content.encode('utf-8')
+
+    def prefix_hash_state(self) -> Any:
+        """
+        Returns the SHA-256 state after hashing serialize_prefix(). Callers must
+        .copy() it before feeding in a nonce. The state is memoized until one of
+        the prefix fields is reassigned; block data is not expected to be
+        mutated in place.
+        """
+        if self._prefix_state is None:
+            self._prefix_state = hashlib.sha256(self.serialize_prefix())
+        return self._prefix_state
+
+    def calculate_hash(self, use_cache: bool = True) -> str:
+        """
+        Calculates the hash of the block's content. The result is memoized until
+        a hashed field is reassigned, so revalidating an unchanged chain does
+        not hash every block again. Mutating block data in place does not clear
+        the memo; pass use_cache=False to hash the current contents from
+        scratch, as integrity audits must.
+        """
+        if not use_cache:
+            self._prefix_state = hashlib.sha256(self.serialize_prefix())
+        elif self._hash is not None:
+            return self._hash
+        first_hash = self.prefix_hash_state().copy()
+        first_hash.update(str(self.nonce).encode('utf-8'))
+        double_hash = hashlib.sha256(first_hash.digest()).hexdigest()
+        self._hash = double_hash
         return double_hash
 
     def __str__(self) -> str:
@@ -66,14 +115,11 @@ class Block:
     @classmethod
     def from_dict(cls, block_dict: Dict[str, Any]) -> 'Block':
         """Create a Block instance from a dictionary"""
-        block = cls(
-            index=block_dict['index'],
-            previous_hash=block_dict['previous_hash'],
-            timestamp=block_dict['timestamp'],
-            data=block_dict['data'],
-            signature=block_dict['signature'],
-            nonce=block_dict['nonce']
-        )
-        block.version = block_dict['version']
-        block.current_hash = block_dict['current_hash']
+        # Fill the slots directly: a new block has no cached hash state for
+        # __setattr__ to invalidate, and loading a chain builds every block here
+        block = cls.__new__(cls)
+        for name in _DICT_FIELDS:
+            _set_slot(block, name, block_dict[name])
+        _set_slot(block, '_prefix_state', None)
+        _set_slot(block, '_hash', None)
         return block
@@ -1,18 +1,92 @@
 import time
 import json
+import hashlib
+import bisect
 import os
 import logging
+import multiprocessing
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Union
-from signature import verify_signature, generate_dp_page_signature
-from cryptography.hazmat.primitives import serialization
+from signature import verify_signature_pem, generate_dp_page_signature
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
 from block import Block
 
 BlockchainNode = Any 
 
 BLOCKCHAIN_FILE = os.path.join("data", "blockchain", "chain.json")
+POW_NONCE_BATCH_DIGITS = 3
+POW_NONCE_BATCH_SIZE = 10 ** POW_NONCE_BATCH_DIGITS  # Nonces tried between checks of the mining stop event
+POW_PARALLEL_MIN_DIFFICULTY = 5  # Below this a block is mined before worker processes would start
+SIGNATURE_PARALLEL_MIN_BLOCKS = 2  # Fewer blocks than this are verified without a thread pool
+
+
+# Set in each parallel proof-of-work process by _init_pow_worker
+_pow_found = None
+
+# The low decimal digits of every nonce in a batch, zero-padded
+_POW_NONCE_SUFFIXES = tuple(str(i).zfill(POW_NONCE_BATCH_DIGITS).encode('utf-8')
+                            for i in range(POW_NONCE_BATCH_SIZE))
+
+def _init_pow_worker(found_event: Any) -> None:
+    """Pool initializer: shares the 'nonce found' flag with a proof-of-work process."""
+    global _pow_found
+    _pow_found = found_event
+
+
+def _search_nonce_batch(prefix_state: Any, batch: int, target: bytes) -> int:
+    """
+    Tries the nonces batch * POW_NONCE_BATCH_SIZE up to the next batch against
+    `target`, continuing from a copy of the block's prefix hash state. Returns
+    the first nonce found, or -1.
+    """
+    sha256 = hashlib.sha256
+    if batch == 0:
+        # These nonces have fewer digits than the suffixes
+        for nonce in range(POW_NONCE_BATCH_SIZE):
+            first_hash = prefix_state.copy()
+            first_hash.update(str(nonce).encode('utf-8'))
+            if sha256(first_hash.digest()).digest() <= target:
+                return nonce
+        return -1
+
+    # Every nonce in the batch starts with the same digits, so they are
+    # hashed once and each attempt only adds its precomputed low digits
+    batch_state = prefix_state.copy()
+    batch_state.update(str(batch).encode('utf-8'))
+    for i, suffix in enumerate(_POW_NONCE_SUFFIXES):
+        first_hash = batch_state.copy()
+        first_hash.update(suffix)
+        if sha256(first_hash.digest()).digest() <= target:
+            return batch * POW_NONCE_BATCH_SIZE + i
+    return -1
+
+
+def _search_nonce_batches(prefix: bytes, target: bytes, start: int, stride: int) -> int:
+    """
+    Parallel proof-of-work worker: tries nonce batches start, start + stride, ...
+    against `target` until a nonce is found here or another worker signals
+    success. Returns the nonce, or -1 if the search was stopped.
+    """
+    prefix_state = hashlib.sha256(prefix)
+    batch = start
+    while not _pow_found.is_set():
+        nonce = _search_nonce_batch(prefix_state, batch, target)
+        if nonce >= 0:
+            _pow_found.set()
+            return nonce
+        batch += stride
+    return -1
+
+
+def content_digest(content: str) -> bytes:
+    """
+    Digest of page content after the same normalization find_text_matches uses
+    for its exact comparison (collapsed whitespace, case-insensitive).
+    """
+    normalized = ' '.join(content.split()).lower()
+    return hashlib.sha256(normalized.encode('utf-8')).digest()
+
 
 class Blockchain:
     """A simple blockchain implementation with Proof of Work and document indexing."""
@@ -21,8 +95,20 @@ class Blockchain:
         self.difficulty_string = '0' * difficulty
         self.blockchain_dir = blockchain_dir
         self.doc_index = {}  # Document index to store blocks by title
+        self._content_index: Dict[bytes, List[Block]] = {}  # Lazily built, see get_blocks_by_content
+        self._content_indexed_chain: Optional[List[Block]] = None
+        self._content_indexed_count = 0
+        self._content_indexed_last: Optional[Block] = None
+        self._saved_count = 0  # Leading blocks of self.chain already in the chain file, see save_chain
+        self._saved_last: Optional[Block] = None
         self.logger = logging.getLogger("blockchain")
         self.lock = threading.RLock()  # Reentrant lock for thread safety
+        # Parallel proof-of-work processes, started with the first block that
+        # needs them and reused for later blocks, see _parallel_proof_of_work
+        self._pow_lock = threading.RLock()
+        self._pow_pool: Optional[Any] = None
+        self._pow_pool_found: Optional[Any] = None
+        self._pow_pool_workers = 0
         
         # Create blockchain directory if it doesn't exist
         os.makedirs(os.path.dirname(self.blockchain_dir), exist_ok=True)
@@ -38,16 +124,69 @@ class Blockchain:
         self.logger.info("Node configured for blockchain broadcasting")
 
     def save_chain(self) -> None:
-        """Save the blockchain to a JSON file"""
+        """
+        Save the blockchain to its file as JSON Lines, one block per line.
+        If the chain has only grown since it was last loaded or saved, just the
+        new blocks are appended. Otherwise (first save, rewind, replaced chain,
+        or a file still in the old JSON array format) the file is rewritten
+        through a temporary file, so an interrupted save never loses the chain.
+        """
         with self.lock:
-            chain_data = [block.to_dict() for block in self.chain]
             try:
-                with open(self.blockchain_dir, 'w') as f:
-                    json.dump(chain_data, f, indent=4)
+                saved = self._saved_count
+                if (saved and saved <= len(self.chain) and self.chain[saved - 1] is self._saved_last
+                        and os.path.exists(self.blockchain_dir)):
+                    with open(self.blockchain_dir, 'a') as f:
+                        for block in self.chain[saved:]:
+                            f.write(json.dumps(block.to_dict()) + "\n")
+                else:
+                    temp_path = self.blockchain_dir + ".part"
+                    with open(temp_path, 'w') as f:
+                        for block in self.chain:
+                            f.write(json.dumps(block.to_dict()) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.blockchain_dir)
+                self._mark_saved()
                 self.logger.info("Blockchain saved successfully to %s", self.blockchain_dir)
             except Exception as e:
                 self.logger.error("Failed to save blockchain: %s", str(e))
 
+    def _mark_saved(self) -> None:
+        """Records the current chain as what the chain file holds."""
+        self._saved_count = len(self.chain)
+        self._saved_last = self.chain[-1] if self.chain else None
+
+    def _read_chain_file(self) -> List[Block]:
+        """
+        Reads the blocks from the chain file, which is either JSON Lines or
+        the older single JSON array. The file only needs rewriting (rather
+        than appending) on the next save if it is in the old format, or if its
+        last line was cut short by an interrupted append and is skipped here.
+        """
+        with open(self.blockchain_dir, 'r') as f:
+            first_line = f.readline()
+            if first_line.lstrip().startswith('['):
+                f.seek(0)
+                self._saved_count = 0
+                return [Block.from_dict(block_dict) for block_dict in json.load(f)]
+
+            chain = []
+            line = first_line
+            while line:
+                if line.strip():
+                    try:
+                        chain.append(Block.from_dict(json.loads(line)))
+                    except json.JSONDecodeError:
+                        if any(rest.strip() for rest in f):
+                            raise
+                        self.logger.warning("Skipping incomplete last block record in %s", self.blockchain_dir)
+                        self._saved_count = 0
+                        return chain
+                line = f.readline()
+            self._saved_count = len(chain)
+            return chain
+
     def load_chain(self) -> bool:
         """Load the blockchain from the JSON file"""
         try:
@@ -56,19 +195,16 @@ class Blockchain:
                 return False
             
             with self.lock:    
-                with open(self.blockchain_dir, 'r') as f:
-                    chain_data = json.load(f)
-                    
-                self.chain = [Block.from_dict(block_dict) for block_dict in chain_data]
+                self.chain = self._read_chain_file()
+                if self._saved_count:
+                    self._mark_saved()
                 self.logger.info("Blockchain loaded successfully: %d blocks", len(self.chain))
                 self.logger.info("Existing blockchain loaded. Validating...")
                 self.validate_and_repair_chain()  # Validate and repair chain if needed
                 print("Building document index...please wait.")
                 self.logger.debug("Building document index...")
                 # build index after the validation
-                for block in self.chain:
-                    if isinstance(block.data, dict) and 'title' in block.data:
-                        self.add_block_to_index(block)
+                self.rebuild_doc_index()
                 return True
         except Exception as e:
             self.logger.error("Failed to load blockchain: %s", str(e))
@@ -81,9 +217,6 @@ class Blockchain:
             self._create_genesis_block()
             return
 
-        valid_chain = [self.chain[0]]  # Start with genesis block
-        total_blocks = len(self.chain)
-        
         # Validate genesis block
         if not self._is_genesis_block_valid(self.chain[0]):
             self.logger.warning("Genesis block tampered. Creating new blockchain...")
@@ -93,19 +226,11 @@ class Blockchain:
         print("\nValidating blockchain...")
         self.logger.info("Validating blockchain...")
         # Validate rest of the chain
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = valid_chain[-1]
-            
-            # Print progress
-            if i % 50 == 0 or i == len(self.chain) - 1:
-                print(f"Progress: {i}/{total_blocks} blocks ({(i/total_blocks*100):.1f}%)", end='\r')
-            
-            if self.is_new_block_valid(current_block, previous_block):
-                valid_chain.append(current_block)
-            else:
-                self.logger.warning(f"Chain tampered at block {i}. Discarding this and all subsequent blocks.")
-                break
+        invalid_at = self._find_first_invalid_block(progress=True, use_cache=False)
+        valid_chain = self.chain
+        if invalid_at is not None:
+            self.logger.warning(f"Chain tampered at block {invalid_at}. Discarding this and all subsequent blocks.")
+            valid_chain = self.chain[:invalid_at]
 
         if len(valid_chain) < len(self.chain):
             self.logger.info(f"Removed {len(self.chain) - len(valid_chain)} invalid blocks")
@@ -121,7 +246,7 @@ class Blockchain:
             return False
         if block.previous_hash != "0":
             return False
-        if block.current_hash != block.calculate_hash():
+        if block.current_hash != block.calculate_hash(use_cache=False):
             return False
         if not block.current_hash.startswith(self.difficulty_string):
             return False
@@ -162,12 +287,29 @@ class Blockchain:
         
         title = block.data['title']
         with self.lock:
-            if title not in self.doc_index:
-                self.doc_index[title] = []
-            self.doc_index[title].append(block)
-            self.doc_index[title].sort(key=lambda b: b.index)
+            title_blocks = self.doc_index.setdefault(title, [])
+            # Blocks normally arrive in chain order, so appending keeps the list sorted
+            if not title_blocks or title_blocks[-1].index < block.index:
+                title_blocks.append(block)
+            else:
+                position = bisect.bisect_right([b.index for b in title_blocks], block.index)
+                title_blocks.insert(position, block)
         self.logger.debug("Block %d added to index for document '%s'", block.index, title)
 
+    def rebuild_doc_index(self) -> None:
+        """
+        Rebuilds the document index from the current chain in a single pass.
+        The chain is ordered by block index, so each title's blocks are
+        collected already sorted.
+        """
+        doc_index: Dict[str, List[Block]] = {}
+        with self.lock:
+            for block in self.chain:
+                if isinstance(block.data, dict) and 'title' in block.data:
+                    doc_index.setdefault(block.data['title'], []).append(block)
+            self.doc_index = doc_index
+        self.logger.debug("Document index rebuilt: %d documents", len(doc_index))
+
     def get_blocks_by_title(self, title: str) -> List[Block]:
         """Returns all blocks associated with a given document title."""
         with self.lock:
@@ -176,6 +318,27 @@ class Blockchain:
                 return []
             return self.doc_index[title]
 
+    def get_blocks_by_content(self, content: str) -> List[Block]:
+        """
+        Returns all blocks whose page content is an exact (normalized) match for
+        `content`, in chain order. The content index is built lazily and
+        extended as the chain grows; it is rebuilt if the chain was replaced or
+        rewound.
+        """
+        with self.lock:
+            indexed = self._content_indexed_count
+            if (self._content_indexed_chain is not self.chain or indexed > len(self.chain)
+                    or (indexed and self.chain[indexed - 1] is not self._content_indexed_last)):
+                self._content_index = {}
+                indexed = 0
+            for block in self.chain[indexed:]:
+                if isinstance(block.data, dict) and isinstance(block.data.get('content'), str):
+                    self._content_index.setdefault(content_digest(block.data['content']), []).append(block)
+            self._content_indexed_chain = self.chain
+            self._content_indexed_count = len(self.chain)
+            self._content_indexed_last = self.chain[-1] if self.chain else None
+            return self._content_index.get(content_digest(content), [])
+
     def get_latest_block(self) -> Optional[Block]:
         """Returns the last block in the chain."""
         with self.lock:
@@ -184,24 +347,27 @@ class Blockchain:
             return self.chain[-1]
 
     def add_block(self, data: Dict[str, Any], signature: str, stop_event: threading.Event) -> Optional[Block]:
-        """Creates a new block, performs PoW, and adds it to the chain."""
-        with self.lock:
+        """
+        Creates a new block, performs PoW, and adds it to the chain. The chain
+        lock is not held while mining, so readers are not blocked for the
+        length of the proof of work; if the chain tip moved in the meantime the
+        block is mined again on top of the new tip.
+        """
+        if not isinstance(data, dict):
+            self.logger.error("Data must be a dictionary.")
+            return None
+
+        while True:
             latest_block = self.get_latest_block()
             if not latest_block:
                 self.logger.error("Genesis block not found. Cannot add new block.")
                 return None
-            if not isinstance(data, dict):
-                self.logger.error("Data must be a dictionary.")
-                return None
 
             new_index = latest_block.index + 1
-            new_timestamp = int(time.time())
-            previous_hash = latest_block.current_hash
-
             new_block = Block(
                 index=new_index,
-                previous_hash=previous_hash,
-                timestamp=new_timestamp,
+                previous_hash=latest_block.current_hash,
+                timestamp=int(time.time()),
                 data=data,
                 signature=signature,
                 nonce=0
@@ -218,22 +384,27 @@ class Blockchain:
             new_block.nonce = mined_nonce
             new_block.current_hash = new_block.calculate_hash()
 
-            if self.is_new_block_valid(new_block, latest_block):
-                self.chain.append(new_block)
-                self.add_block_to_index(new_block)
-                self.logger.info(f"Block #{new_block.index} added to the blockchain.")
-                if hasattr(self, 'node'):
-                    try:
-                        self.node.broadcast_new_block(new_block)
-                        self.logger.info(f"Block #{new_block.index} broadcast successfully")
-                    except Exception as e:
-                        self.logger.error(f"Failed to broadcast block #{new_block.index}: {str(e)}")
+            with self.lock:
+                if self.get_latest_block() is not latest_block:
+                    self.logger.warning(f"Chain changed while mining block #{new_index}. Mining again on the new tip.")
+                    continue
+
+                if self.is_new_block_valid(new_block, latest_block):
+                    self.chain.append(new_block)
+                    self.add_block_to_index(new_block)
+                    self.logger.info(f"Block #{new_block.index} added to the blockchain.")
+                    if hasattr(self, 'node'):
+                        try:
+                            self.node.broadcast_new_block(new_block)
+                            self.logger.info(f"Block #{new_block.index} broadcast successfully")
+                        except Exception as e:
+                            self.logger.error(f"Failed to broadcast block #{new_block.index}: {str(e)}")
+                    else:
+                        self.logger.warning("No node configured - block will not be broadcast")
+                    return new_block
                 else:
-                    self.logger.warning("No node configured - block will not be broadcast")
-                return new_block
-            else:
-                self.logger.error(f"New block #{new_block.index} was invalid. Not added.")
-                return None
+                    self.logger.error(f"New block #{new_block.index} was invalid. Not added.")
+                    return None
 
     def _proof_of_work(self, block_to_mine: Block, stop_event: threading.Event) -> int:
         """
@@ -242,22 +413,38 @@ class Blockchain:
           has a certain number of leading zeros.
         """
         
-        data_preview = json.dumps(block_to_mine.data, sort_keys=True, separators=(',', ':'))
-        if len(data_preview) > 50:
-            data_preview = data_preview[:47] + "..."
-            
-        self.logger.info("Mining block %d with data: '%s'", block_to_mine.index, data_preview)
+        # The preview dumps the whole page, so only build it when it is logged
+        if self.logger.isEnabledFor(logging.INFO):
+            data_preview = json.dumps(block_to_mine.data, sort_keys=True, separators=(',', ':'))
+            if len(data_preview) > 50:
+                data_preview = data_preview[:47] + "..."
+            self.logger.info("Mining block %d with data: '%s'", block_to_mine.index, data_preview)
+        
+        # Hash the nonce-independent prefix once; each attempt continues from a
+        # copy of that state (same result as block_to_mine.calculate_hash())
+        prefix_state = block_to_mine.prefix_hash_state()
+        # A hex digest starts with `difficulty` zeros exactly when the raw
+        # digest, read big-endian, is at most 16**(64 - difficulty) - 1; raw
+        # bytes compare in that same order, so no hex conversion per attempt
+        difficulty = len(self.difficulty_string)
+        target = (16 ** (64 - difficulty) - 1).to_bytes(32, 'big')
         
-        nonce_to_try = 0
+        workers = os.cpu_count() or 1
+        if difficulty >= POW_PARALLEL_MIN_DIFFICULTY and workers > 1:
+            return self._parallel_proof_of_work(block_to_mine, target, workers, stop_event)
+        
+        # Nonces are tried in batches so the stop event is polled once per batch
+        # rather than once per hash
+        batch = 0
         while not stop_event.is_set():
-            block_to_mine.nonce = nonce_to_try
-            calculated_hash = block_to_mine.calculate_hash()
-
-            if calculated_hash.startswith(self.difficulty_string):
+            nonce = _search_nonce_batch(prefix_state, batch, target)
+            if nonce >= 0:
+                block_to_mine.nonce = nonce
                 self.logger.info("Block %d Mined! Nonce: %d, Hash: %s", 
-                               block_to_mine.index, nonce_to_try, calculated_hash)
-                return nonce_to_try
-            nonce_to_try += 1
+                               block_to_mine.index, nonce, block_to_mine.calculate_hash())
+                return nonce
+            batch += 1
+            nonce_to_try = batch * POW_NONCE_BATCH_SIZE
             if nonce_to_try % 100000 == 0:
                 self.logger.debug("Mining progress - Tried %d nonces for block %d", 
                                 nonce_to_try, block_to_mine.index)
@@ -266,9 +453,73 @@ class Blockchain:
         self.logger.info(f"Mining for block {block_to_mine.index} was interrupted.")
         return -1 # Return -1 to indicate interruption
 
+    def _parallel_proof_of_work(self, block_to_mine: Block, target: bytes, workers: int,
+                                stop_event: threading.Event) -> int:
+        """
+        Proof of Work spread over `workers` processes, each trying every
+        `workers`-th batch of nonces. Workers are spawned rather than forked, as mining
+        runs on a background thread; since each spawned process re-imports the
+        application, the pool is kept for later blocks until close_mining_pool.
+        Returns the lowest of the nonces the workers found, or -1 if
+        `stop_event` was set first.
+        """
+        with self._pow_lock:
+            if self._pow_pool is None or self._pow_pool_workers != workers:
+                self.close_mining_pool()
+                ctx = multiprocessing.get_context('spawn')
+                self._pow_pool_found = ctx.Event()
+                self._pow_pool = ctx.Pool(workers, initializer=_init_pow_worker,
+                                          initargs=(self._pow_pool_found,))
+                self._pow_pool_workers = workers
+            pool, found = self._pow_pool, self._pow_pool_found
+            # Every search of the previous block has returned, see below
+            found.clear()
+            prefix = block_to_mine.serialize_prefix()
+            results = [pool.apply_async(_search_nonce_batches, (prefix, target, offset, workers))
+                       for offset in range(workers)]
+            interrupted = False
+            while not any(result.ready() for result in results):
+                if stop_event.is_set():
+                    interrupted = True
+                    break
+                found.wait(0.1)
+            # Several workers may have hit the target; let them all report.
+            # Waiting for every worker also leaves the pool idle for the next block.
+            found.set()
+            nonces = [result.get() for result in results]
+
+        if interrupted:
+            self.logger.info(f"Mining for block {block_to_mine.index} was interrupted.")
+            return -1
+        nonce = min(n for n in nonces if n >= 0)
+        block_to_mine.nonce = nonce
+        self.logger.info("Block %d Mined! Nonce: %d, Hash: %s (%d workers)", 
+                       block_to_mine.index, nonce, block_to_mine.calculate_hash(), workers)
+        return nonce
+
+    def close_mining_pool(self) -> None:
+        """Stops the parallel proof-of-work processes, if any were started."""
+        with self._pow_lock:
+            if self._pow_pool is not None:
+                self._pow_pool.terminate()
+                self._pow_pool.join()
+                self._pow_pool = None
+                self._pow_pool_found = None
+                self._pow_pool_workers = 0
 
     def is_new_block_valid(self, new_block: Block, previous_block: Block) -> bool:
         """Validates a new block before adding it to the chain."""
+        return (self._is_block_structure_valid(new_block, previous_block)
+                and self._is_block_signature_valid(new_block))
+
+    def _is_block_structure_valid(self, new_block: Block, previous_block: Block,
+                                  use_cache: bool = True, now: Optional[int] = None) -> bool:
+        """
+        Checks everything about a block except its signature. With
+        use_cache=False the block hash is recomputed rather than memoized.
+        `now` is the current time for the future-timestamp check; chain scans
+        read the clock once and pass it to every block.
+        """
         if new_block.index != previous_block.index + 1:
             self.logger.error("Block %d validation failed: Invalid index. Expected %d", 
                             new_block.index, previous_block.index + 1)
@@ -278,8 +529,10 @@ class Blockchain:
             self.logger.error("Block %d validation failed: Previous hash mismatch", new_block.index)
             return False
             
-        if new_block.current_hash != new_block.calculate_hash():
-            self.logger.error("Block %d validation failed: Current hash is incorrect", new_block.index)
+        # Cheap field checks run first; the hash is only recomputed for
+        # blocks that pass them
+        if not isinstance(new_block.current_hash, str):
+            self.logger.error("Block %d validation failed: Current hash is missing", new_block.index)
             return False
 
         if not new_block.current_hash.startswith(self.difficulty_string):
@@ -287,7 +540,7 @@ class Blockchain:
                             new_block.index, self.difficulty_string)
             return False
             
-        current_time_check = int(time.time())
+        current_time_check = int(time.time()) if now is None else now
         if new_block.timestamp > current_time_check + 60:
             self.logger.error("Block %d validation failed: Timestamp %d is too far in future (current: %d)", 
                             new_block.index, new_block.timestamp, current_time_check)
@@ -298,24 +551,26 @@ class Blockchain:
                             new_block.index, new_block.timestamp, previous_block.timestamp)
             return False
 
-        pem_public_key_str = new_block.data.get('public_key')
-        if not pem_public_key_str:
+        if not new_block.data.get('public_key'):
             self.logger.error("Block %d validation failed: No public key in block data", new_block.index)
             return False
 
+        if new_block.current_hash != new_block.calculate_hash(use_cache=use_cache):
+            self.logger.error("Block %d validation failed: Current hash is incorrect", new_block.index)
+            return False
+
+        return True
+
+    def _is_block_signature_valid(self, new_block: Block) -> bool:
+        """Verifies the RSA signature of a block over its DP page signature."""
         try:
-            public_key = serialization.load_pem_public_key(
-                pem_public_key_str.encode('utf-8'),
-                backend=default_backend()
-            )
-            
             dp_signature = generate_dp_page_signature(
                 new_block.data['content'],
                 new_block.data['title'],
                 new_block.data['page'] + 1
             )
             
-            if not verify_signature(dp_signature, new_block.signature, public_key):
+            if not verify_signature_pem(dp_signature, new_block.signature, new_block.data['public_key']):
                 self.logger.error("Block %d validation failed: Signature verification failed", new_block.index)
                 return False
                 
@@ -326,8 +581,48 @@ class Blockchain:
             self.logger.error("Block %d validation failed with exception: %s", new_block.index, str(e))
             return False
 
-    def is_chain_valid(self) -> bool:
-        """Validates the integrity of the entire blockchain."""
+    def _find_first_invalid_block(self, progress: bool = False, use_cache: bool = True) -> Optional[int]:
+        """Returns the position of the first invalid block after genesis, or None.
+
+        A sequential pass checks links, proof of work and hashes; signatures
+        of the blocks that pass are then verified in parallel threads, since
+        RSA verification releases the GIL. use_cache=False recomputes every
+        block hash instead of trusting the memoized ones.
+        """
+        total_blocks = len(self.chain)
+        first_invalid = None
+        now = int(time.time())
+        for i in range(1, total_blocks):
+            if progress and (i % 50 == 0 or i == total_blocks - 1):
+                print(f"Progress: {i}/{total_blocks} blocks ({(i/total_blocks*100):.1f}%)", end='\r')
+            if not self._is_block_structure_valid(self.chain[i], self.chain[i - 1], use_cache, now):
+                first_invalid = i
+                break
+
+        to_verify = self.chain[1:first_invalid]
+        if len(to_verify) < SIGNATURE_PARALLEL_MIN_BLOCKS:
+            for i, block in enumerate(to_verify, start=1):
+                if not self._is_block_signature_valid(block):
+                    return i
+            return first_invalid
+        pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        try:
+            # map yields in chain order, so the first failure is the earliest one
+            for i, valid in enumerate(pool.map(self._is_block_signature_valid, to_verify), start=1):
+                if not valid:
+                    return i
+        finally:
+            pool.shutdown(cancel_futures=True)
+        return first_invalid
+
+    def is_chain_valid(self, audit: bool = True) -> bool:
+        """
+        Validates the integrity of the entire blockchain. By default this is a
+        full audit that rehashes every block from its current contents. Pass
+        audit=False for repeat health checks within a session: block hashes
+        are then taken from the memo, which only notices fields that were
+        reassigned, not data mutated in place.
+        """
         with self.lock:
             if not self.chain:
                 self.logger.info("Chain is empty.")
@@ -338,7 +633,7 @@ class Blockchain:
             if genesis_block.index != 0:
                 self.logger.error("Chain Error: Genesis Block index is not 0.")
                 return False
-            if genesis_block.current_hash != genesis_block.calculate_hash(): # Recalculate to check for tampering
+            if genesis_block.current_hash != genesis_block.calculate_hash(use_cache=not audit): # Recalculate to check for tampering
                 self.logger.error("Chain Error: Genesis Block {genesis_block.index} hash is tampered.")
                 return False
             if not genesis_block.current_hash.startswith(self.difficulty_string): # Check PoW
@@ -346,13 +641,11 @@ class Blockchain:
                 return False
 
             # Check rest of the chain
-            for i in range(1, len(self.chain)):
-                current_block = self.chain[i]
-                previous_block = self.chain[i-1]
-                
-                if not self.is_new_block_valid(current_block, previous_block):
-                     self.logger.error("Chain Error: Validation failed for Block {current_block.index} when checking against Block {previous_block.index}.")
-                     return False
+            invalid_at = self._find_first_invalid_block(use_cache=not audit)
+            if invalid_at is not None:
+                self.logger.error("Chain Error: Validation failed for Block %d when checking against Block %d.",
+                                  self.chain[invalid_at].index, self.chain[invalid_at - 1].index)
+                return False
         
         self.logger.info("Blockchain is valid.")
         return True
@@ -393,10 +686,7 @@ class Blockchain:
                 self.chain = self.chain[:index + 1]
 
             # Rebuild the document index
-            self.doc_index.clear()
-            for block in self.chain:
-                if isinstance(block.data, dict) and 'title' in block.data:
-                    self.add_block_to_index(block)
+            self.rebuild_doc_index()
 
             self.save_chain()  # Save the updated chain to file
             self.logger.info(f"Rewind complete. Chain height is now {len(self.chain)}")
@@ -2,9 +2,9 @@ import os
 import signal
 from time import sleep
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
 import sys
 
 from blockchain import Blockchain
@@ -14,16 +14,14 @@ from signature import (
     generate_dp_page_signature,
     get_keypair_by_username,
     sign_data,
-    verify_signature,
+    verify_signature_pem,
     generate_key_pair
 )
-from text_matcher import find_text_matches
+from text_matcher import find_text_matches, char_profile, similarity_upper_bound
 from mining_worker import BlockMiningWorker # Import from the new file
 
 from logging_config import setup_logging
-setup_logging()
 logger = logging.getLogger(__name__)
-logger.info("Application starting...")
 
 class Colors:
     GREEN = '\033[92m'
@@ -125,6 +123,8 @@ class DocValidatorApp:
             logger.info("Mining worker stopped.")
             print("Mining worker stopped.")
 
+        self.blockchain.close_mining_pool()
+
         print("Exiting the system...")
         sleep(1)
 
@@ -193,15 +193,19 @@ class DocValidatorApp:
         
         print("\nPreparing document for mining...")
         document_tasks = []
-        for i, page_content in enumerate(pages):
+        # Pages are signed independently, and RSA signing releases the GIL
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            signatures = list(pool.map(
+                lambda page: self._sign_page(page[1], title, page[0] + 1, private_key),
+                enumerate(pages)
+            ))
+        for i, (page_content, signature) in enumerate(zip(pages, signatures)):
             data = {
                 'title': title,
                 'page': i, 
                 'content': page_content,
                 'public_key': public_key_pem
             }
-            page_signature_dp = generate_dp_page_signature(page_content, title, i + 1)
-            signature = sign_data(page_signature_dp, private_key)
             document_tasks.append({'data': data, 'signature': signature})
 
         # Add the entire document as a single task
@@ -275,38 +279,39 @@ class DocValidatorApp:
 
         print("\nVerifying blocks...")
         verified_pages_indices = set()
+
+        # Pair each page with the block holding its exact content, then check
+        # all signatures in parallel; hashing and RSA verification release the GIL
+        page_blocks = {}
+        for i, page_content in enumerate(pages):
+            for block in doc_blocks:
+                if block.data.get('page') == i and block.data.get('content','').strip() == page_content.strip():
+                    page_blocks[i] = block
+                    break
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            signature_results = dict(zip(page_blocks, pool.map(self._verify_block_signature, page_blocks.values())))
         
         for i, page_content in enumerate(pages):
             print(f"\nVerifying Page {i+1}...")
             page_verified_this_iteration = False
             
-            for block in doc_blocks:
-                if block.data.get('page') == i and block.data.get('content','').strip() == page_content.strip():
-                    page_signature_dp = generate_dp_page_signature(
-                        block.data['content'],
-                        block.data['title'],
-                        block.data['page'] + 1 
-                    )
-                    public_key = serialization.load_pem_public_key(
-                        block.data['public_key'].encode('utf-8'),
-                        backend=default_backend()
-                    )
-                    if verify_signature(page_signature_dp, block.signature, public_key):
-                        print(f"{Colors.GREEN}✓ Page {i+1} verified successfully.{Colors.RESET}")
-                        print(f"  Block #{block.index}, Timestamp: {datetime.fromtimestamp(block.timestamp)}")
-                        verified_pages_indices.add(i)
-                        page_verified_this_iteration = True
-                    else:
-                        print(f"{Colors.RED}✗ Page {i+1} VERIFICATION FAILED - Signature invalid for exact content match.{Colors.RESET}")
-                        tampered_pages[i] = {
-                            'original': block.data['content'], 
-                            'modified': page_content, 
-                            'block': block,
-                            'similarity': 100.0, 
-                            'matches': [],
-                            'reason': 'signature_invalid'
-                        }
-                    break 
+            block = page_blocks.get(i)
+            if block is not None:
+                if signature_results[i]:
+                    print(f"{Colors.GREEN}✓ Page {i+1} verified successfully.{Colors.RESET}")
+                    print(f"  Block #{block.index}, Timestamp: {datetime.fromtimestamp(block.timestamp)}")
+                    verified_pages_indices.add(i)
+                    page_verified_this_iteration = True
+                else:
+                    print(f"{Colors.RED}✗ Page {i+1} VERIFICATION FAILED - Signature invalid for exact content match.{Colors.RESET}")
+                    tampered_pages[i] = {
+                        'original': block.data['content'], 
+                        'modified': page_content, 
+                        'block': block,
+                        'similarity': 100.0, 
+                        'matches': [],
+                        'reason': 'signature_invalid'
+                    }
             
             if page_verified_this_iteration:
                 continue
@@ -349,17 +354,51 @@ class DocValidatorApp:
         print(f"\nVerification completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")        
         input("\nPress Enter to continue...")
 
+    def _sign_page(self, page_content, title, page_number, private_key):
+        """Computes a page's DP signature and signs it with the private key."""
+        page_signature_dp = generate_dp_page_signature(page_content, title, page_number)
+        return sign_data(page_signature_dp, private_key)
+
+    def _verify_block_signature(self, block):
+        """Recomputes a block's DP page signature and checks it against the stored signature."""
+        page_signature_dp = generate_dp_page_signature(
+            block.data['content'],
+            block.data['title'],
+            block.data['page'] + 1 
+        )
+        return verify_signature_pem(page_signature_dp, block.signature, block.data['public_key'])
+
     def _check_for_pages_by_content(self, pages, blocks_to_check):
         logger.info(f"Checking for pages by content. Pages: {len(pages)}, Blocks to check: {len(blocks_to_check)}")
 
         matching_blocks_for_doc = [] 
         tampered_info = {} 
         available_blocks = list(blocks_to_check)
+        available_block_ids = {id(block) for block in available_blocks}
+        # Character profiles for the fuzzy pass's cheap upper-bound check, built on first use
+        block_profiles = {}
 
         for page_idx, page_content_current_doc in enumerate(pages):
             found_exact_match_for_page = False
             best_similarity_for_page = -1.0
             candidate_tampered_block = None
+
+            # Unmodified pages are found through the blockchain's content index
+            # without running the text matcher at all
+            for block in self.blockchain.get_blocks_by_content(page_content_current_doc):
+                if block.data.get('page') == page_idx and id(block) in available_block_ids:
+                    matching_blocks_for_doc.append(block)
+                    found_exact_match_for_page = True
+                    print(f"Found exact match for page {page_idx + 1} (Block #{block.index})")
+                    break
+
+            if found_exact_match_for_page:
+                continue
+            
+            page_content_current_doc_stripped = page_content_current_doc.strip()
+            # Comparisons made against same-page blocks are reused by the fuzzy pass below
+            same_page_results = {}
+            page_profile = None
             
             # Prioritize exact match for the current page index
             for block_idx, block in enumerate(available_blocks):
@@ -367,9 +406,10 @@ class DocValidatorApp:
                     continue
 
                 block_content_stored = block.data['content'].strip()
-                page_content_current_doc_stripped = page_content_current_doc.strip()
                 
-                match_type, similarity, _ = find_text_matches(block_content_stored, page_content_current_doc_stripped) #
+                result = find_text_matches(block_content_stored, page_content_current_doc_stripped) #
+                same_page_results[id(block)] = result
+                match_type, similarity, _ = result
                 
                 if match_type == 'exact':
                     matching_blocks_for_doc.append(block)
@@ -385,14 +425,28 @@ class DocValidatorApp:
                 if 'content' not in block.data: # or block in matching_blocks_for_doc: # Already used as exact
                     continue
 
-                block_content_stored = block.data['content'].strip()
-                page_content_current_doc_stripped = page_content_current_doc.strip()
-                match_type, similarity, matches = find_text_matches(block_content_stored, page_content_current_doc_stripped) #
+                result = same_page_results.get(id(block))
+                if result is None:
+                    # Skip blocks that could not beat the current best match
+                    if page_profile is None:
+                        page_profile = char_profile(page_content_current_doc_stripped)
+                    block_profile = block_profiles.get(id(block))
+                    if block_profile is None:
+                        block_profile = block_profiles[id(block)] = char_profile(block.data['content'])
+                    upper_bound = similarity_upper_bound(block_profile, page_profile)
+                    if upper_bound < 30 or upper_bound <= best_similarity_for_page:
+                        continue
+
+                    block_content_stored = block.data['content'].strip()
+                    result = find_text_matches(block_content_stored, page_content_current_doc_stripped) #
+                match_type, similarity, matches = result
 
                 if similarity > best_similarity_for_page and similarity >= 30: 
                     best_similarity_for_page = similarity
                     candidate_tampered_block = block
                     candidate_matches_info = matches # Store matches for potential display
+                    if similarity >= 100:
+                        break # Nothing can score higher
             
             if candidate_tampered_block:
                 # Check if this block was already assigned as an exact match to another page
@@ -524,6 +578,7 @@ class DocValidatorApp:
             '5': self._connect_to_peer,
         }
 
+        menu_notice = ""
         while True:
             self._clear_terminal()
             # Check mining status
@@ -540,6 +595,10 @@ class DocValidatorApp:
             print("5. Connect to peer")
             print("6. Exit")
             print("---------------------------------------")
+            if menu_notice:
+                # Shown with the redrawn menu instead of pausing before the redraw
+                print(menu_notice)
+                menu_notice = ""
             choice = input("Enter your choice: ")
 
             if choice in menu_actions:
@@ -552,10 +611,11 @@ class DocValidatorApp:
                 break
             else:
                 logger.warning(f"Invalid menu choice: {choice}")
-                print(f"{Colors.RED}Invalid choice. Please try again.{Colors.RESET}")
-                sleep(1)
+                menu_notice = f"{Colors.RED}Invalid choice. Please try again.{Colors.RESET}"
 
 if __name__ == "__main__":
+    setup_logging()
+    logger.info("Application starting...")
     app = None
     try:
         app = DocValidatorApp()
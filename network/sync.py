@@ -27,8 +27,8 @@ def handle_blocks(sock: Any, blockchain: Blockchain, payload: dict[str, Any], pe
                 for block_dict in blocks_data:
                     block_to_add = Block.from_dict(block_dict)
                     blockchain.chain.append(block_to_add)
-                    blockchain.add_block_to_index(block_to_add)
                     newly_added_blocks += 1
+                blockchain.rebuild_doc_index()
                     
                 if newly_added_blocks > 0:
                     logger.info(f"Successfully added {newly_added_blocks} blocks starting with genesis")
@@ -1,11 +1,45 @@
 from pypdf import PdfReader
+import os
 import re
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Optional, Dict, Any
 
-def parse_pdf_to_pages_text(file_path: str) -> Optional[List[str]]:
+# Page text extraction only moves to worker processes when it would take a while
+# in-process: a spawned worker re-imports the application before it extracts
+# anything (about 0.25 s per worker, about 0.9 s for four), while simple text
+# pages extract in about 1 ms each
+PARALLEL_SAMPLE_PAGES = 4  # Pages extracted in-process to estimate the cost of the rest
+PARALLEL_MIN_SERIAL_SECONDS = 3.0  # Estimated in-process time for the rest that justifies workers
+
+
+def _clean_page_text(text: Optional[str], page_index: int) -> str:
+    """Normalizes the extracted text of one page."""
+    if text:
+        return re.sub(r'\s+', ' ', text).strip()
+    # Handle cases where a page might have no extractable text (e.g., image-only page)
+    return f"[Page {page_index+1} - No text extracted or image-only page]"
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Worker for parse_pdf_to_pages_text: extracts pages [start, stop).
+    Each worker process opens its own reader, as PDF readers are not safe
+    to share between threads or processes.
+    """
+    reader = PdfReader(file_path)
+    return [_clean_page_text(reader.pages[i].extract_text(), i) for i in range(start, stop)]
+
+
+def parse_pdf_to_pages_text(file_path: str, num_workers: Optional[int] = None) -> Optional[List[str]]:
     """
     parses a PDF file and extracts text from each page.
     returns a list of strings, where each string is the text of a page.
+    The first PARALLEL_SAMPLE_PAGES pages are extracted in-process and timed;
+    if the rest would take at least PARALLEL_MIN_SERIAL_SECONDS that way, it
+    is split into page ranges extracted by a pool of `num_workers` processes
+    (default: CPU count).
     """
     pages_text_content = []
     try:
@@ -13,18 +47,42 @@ def parse_pdf_to_pages_text(file_path: str) -> Optional[List[str]]:
         num_pages = len(reader.pages)
         print(f"Number of pages in PDF: {num_pages}")
         print("Extracting text please wait...")
-        for i, page in enumerate(reader.pages):
-            # Display progress as a percentage
-            print(f"Extracting text from PDF... {i + 1}/{num_pages} ({(i + 1) / num_pages * 100:.1f}%)", end='\r')
-            
-            text = page.extract_text()
-
-            if text:
-                text = re.sub(r'\s+', ' ', text).strip()
-                pages_text_content.append(text)
-            else:
-                # Handle cases where a page might have no extractable text (e.g., image-only page)
-                pages_text_content.append(f"[Page {i+1} - No text extracted or image-only page]")
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+
+        def show_progress(done_pages: int) -> None:
+            print(f"Extracting text from PDF... {done_pages}/{num_pages} ({done_pages / num_pages * 100:.1f}%)", end='\r')
+
+        def extract_in_process(start: int, stop: int) -> None:
+            for i in range(start, stop):
+                show_progress(i + 1)
+                pages_text_content.append(_clean_page_text(reader.pages[i].extract_text(), i))
+
+        sampled = min(PARALLEL_SAMPLE_PAGES, num_pages)
+        sample_start = time.perf_counter()
+        extract_in_process(0, sampled)
+        remaining = num_pages - sampled
+        estimated_seconds = (time.perf_counter() - sample_start) / sampled * remaining if sampled else 0.0
+        num_workers = min(num_workers, remaining)
+
+        if num_workers > 1 and estimated_seconds >= PARALLEL_MIN_SERIAL_SECONDS:
+            # A few ranges per worker keeps the progress display moving
+            range_size = -(-remaining // (num_workers * 2))
+            ranges = [(start, min(start + range_size, num_pages)) for start in range(sampled, num_pages, range_size)]
+            results = {}
+            done_pages = sampled
+            # Spawned rather than forked: the caller has mining and network threads running
+            with ProcessPoolExecutor(max_workers=num_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(_extract_page_range, file_path, start, stop): start for start, stop in ranges}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    done_pages += len(results[futures[future]])
+                    show_progress(done_pages)
+            for start, _ in ranges:
+                pages_text_content.extend(results[start])
+        else:
+            extract_in_process(sampled, num_pages)
         
         print("\nText extraction complete.") # Newline and clear rest of the line
             
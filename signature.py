@@ -3,13 +3,17 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.exceptions import InvalidSignature, InvalidKey
+from cryptography.hazmat.backends import default_backend
 import getpass
 import os
+from functools import lru_cache
 from typing import Optional, Tuple, Any
 from DPDocSigner import generate_dp_page_signature, get_dp_signature_details, verify_dp_signature_integrity
 
 
 KEY_PATH = os.path.join("data", "keys")
+VERIFY_CACHE_MAX_SIZE = 4096  # Verification results kept by verify_signature_pem
+PUBLIC_KEY_CACHE_MAX_SIZE = 256  # Parsed public keys kept by load_public_key_pem
 
 def sign_data(dp_signature: str, private_key: Any) -> str:
     """
@@ -62,6 +66,40 @@ def verify_signature(dp_signature: str, signature: str, public_key: Any) -> bool
     except InvalidSignature:
         return False
 
+@lru_cache(maxsize=PUBLIC_KEY_CACHE_MAX_SIZE)
+def load_public_key_pem(public_key_pem: str) -> Any:
+    """
+    Parse a PEM-encoded public key, memoized by the PEM text. A document's
+    pages are normally all signed with one key, so it is decoded only once.
+    
+    Args:
+        public_key_pem (str): The PEM-encoded public key.
+    
+    Returns:
+        Any: The loaded public key.
+    """
+    return serialization.load_pem_public_key(
+        public_key_pem.encode('utf-8'),
+        backend=default_backend()
+    )
+
+@lru_cache(maxsize=VERIFY_CACHE_MAX_SIZE)
+def verify_signature_pem(dp_signature: str, signature: str, public_key_pem: str) -> bool:
+    """
+    Verify a signature against a PEM-encoded public key, memoizing the result.
+    The outcome depends only on the three inputs, so a page that is verified
+    again (on re-verification or chain validation) skips the RSA check.
+    
+    Args:
+        dp_signature (str): The DP signature whose signature is to be verified.
+        signature (str): The signature to be verified.
+        public_key_pem (str): The PEM-encoded public key used for verification.
+    
+    Returns:
+        bool: True if the signature is valid, False otherwise.
+    """
+    return verify_signature(dp_signature, signature, load_public_key_pem(public_key_pem))
+
 def username_exists(username: str) -> bool:
     """
     Check if a key pair with the given username already exists in the key directory.
@@ -214,7 +252,7 @@ def get_keypair_by_username(username: str) -> Tuple[Optional[Any], Optional[Any]
 #     print("=== Testing DP Document Signing System ===\n")
     
 #     # Generate DP signature
-#     dp_signature = generate_dp_page_signature(sample_text, doc_title, page_number)
+#     dp_signature = generate_dp_page_signature(sample_text, doc_title, page_number, record_steps=True)
 #     print(f"Generated DP Signature: {dp_signature[:32]}...\n")
     
 #     # Show DP details
@@ -2,11 +2,16 @@ import unittest
 import os
 import time
 import shutil
+import json
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 from block import Block
-from blockchain import Blockchain
-from signature import sign_data, verify_signature, generate_dp_page_signature
-from text_matcher import find_text_matches
+from blockchain import Blockchain, POW_NONCE_BATCH_SIZE, _search_nonce_batch
+from signature import sign_data, verify_signature, verify_signature_pem, generate_dp_page_signature, verify_dp_signature_integrity
+from text_matcher import find_text_matches, char_profile, similarity_upper_bound
+from DPDocSigner import _get_signer
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
@@ -110,6 +115,143 @@ class TestBlockchain(unittest.TestCase):
         self.assertEqual(self.blockchain.get_latest_block().index, 1)
         self.assertTrue(self.blockchain.is_chain_valid())
 
+    def test_add_block_remines_after_tip_change(self):
+        """Test that a block is mined again on the new tip if the chain grows while mining."""
+        self.test_add_block_and_validation()
+        signed = self.blockchain.chain[1]
+        stop_event = MagicMock()
+        stop_event.is_set.return_value = False
+        proof_of_work = self.blockchain._proof_of_work
+        peer_blocks = []
+
+        def proof_of_work_with_peer_block(block, event):
+            nonce = proof_of_work(block, event)
+            if not peer_blocks:
+                # Another block lands on the chain while this one is being mined
+                latest = self.blockchain.get_latest_block()
+                peer_block = Block(index=latest.index + 1, previous_hash=latest.current_hash,
+                                   timestamp=latest.timestamp, data={'message': 'peer'}, signature='sig')
+                peer_block.nonce = proof_of_work(peer_block, event)
+                peer_block.current_hash = peer_block.calculate_hash()
+                self.blockchain.chain.append(peer_block)
+                peer_blocks.append(peer_block)
+            return nonce
+
+        with patch.object(self.blockchain, '_proof_of_work', side_effect=proof_of_work_with_peer_block):
+            added_block = self.blockchain.add_block(dict(signed.data), signed.signature, stop_event)
+
+        self.assertIsNotNone(added_block)
+        self.assertEqual(len(self.blockchain.chain), 4)
+        self.assertEqual(added_block.index, 3)
+        self.assertEqual(added_block.previous_hash, peer_blocks[0].current_hash)
+
+    def test_parallel_proof_of_work(self):
+        """Test that the multi-process miner finds a nonce meeting the difficulty."""
+        block = Block(
+            index=1,
+            previous_hash=self.blockchain.get_latest_block().current_hash,
+            timestamp=int(time.time()),
+            data={'message': 'parallel'},
+            signature='sig'
+        )
+        stop_event = MagicMock()
+        stop_event.is_set.return_value = False
+        target = (16 ** (64 - 2) - 1).to_bytes(32, 'big')
+        self.addCleanup(self.blockchain.close_mining_pool)
+        nonce = self.blockchain._parallel_proof_of_work(block, target, 2, stop_event)
+        self.assertEqual(block.nonce, nonce)
+        self.assertTrue(block.calculate_hash().startswith('00'))
+
+        # The next block is mined by the same worker processes
+        pool = self.blockchain._pow_pool
+        next_block = Block(index=2, previous_hash=block.calculate_hash(), timestamp=int(time.time()),
+                           data={'message': 'parallel again'}, signature='sig')
+        nonce = self.blockchain._parallel_proof_of_work(next_block, target, 2, stop_event)
+        self.assertIs(self.blockchain._pow_pool, pool)
+        self.assertEqual(next_block.nonce, nonce)
+        self.assertTrue(next_block.calculate_hash().startswith('00'))
+
+    def test_nonce_batch_search(self):
+        """Test that batched nonce search finds the same first nonce as hashing each nonce in full."""
+        block = Block(index=1, previous_hash='0' * 64, timestamp=1700000000,
+                      data={'message': 'batch'}, signature='sig')
+        target = (16 ** (64 - 2) - 1).to_bytes(32, 'big')
+        for batch in (0, 1, 12):
+            expected = -1
+            for nonce in range(batch * POW_NONCE_BATCH_SIZE, (batch + 1) * POW_NONCE_BATCH_SIZE):
+                block.nonce = nonce
+                if block.calculate_hash().startswith('00'):
+                    expected = nonce
+                    break
+            self.assertEqual(_search_nonce_batch(block.prefix_hash_state(), batch, target), expected)
+
+    def test_chain_file_round_trip(self):
+        """Test appending saves, reloading, and reading older and torn chain files."""
+        self.test_add_block_and_validation()
+        chain_file = self.blockchain.blockchain_dir
+        self.blockchain.save_chain()
+        with open(chain_file) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        def reload():
+            return Blockchain(difficulty=1, blockchain_dir=chain_file)
+        self.assertEqual([b.current_hash for b in reload().chain],
+                         [b.current_hash for b in self.blockchain.chain])
+
+        # A record cut short by an interrupted append is dropped, and the next save rewrites the file
+        with open(chain_file, 'a') as f:
+            f.write('{"index": 2, "previous')
+        reloaded = reload()
+        self.assertEqual(len(reloaded.chain), 2)
+        reloaded.save_chain()
+        with open(chain_file) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        # Chain files written as a single JSON array are still read
+        with open(chain_file, 'w') as f:
+            json.dump([b.to_dict() for b in self.blockchain.chain], f, indent=4)
+        self.assertEqual(len(reload().chain), 2)
+
+    def test_null_current_hash_in_chain_file(self):
+        """Test that a block saved without a hash is cut off on load rather than crashing validation."""
+        self.test_add_block_and_validation()
+        signed = self.blockchain.chain[1]
+        stop_event = MagicMock()
+        stop_event.is_set.return_value = False
+        self.assertIsNotNone(self.blockchain.add_block(dict(signed.data), signed.signature, stop_event))
+        self.blockchain.save_chain()
+
+        chain_file = self.blockchain.blockchain_dir
+        with open(chain_file) as f:
+            records = [json.loads(line) for line in f]
+        records[-1]['current_hash'] = None
+        with open(chain_file, 'w') as f:
+            f.writelines(json.dumps(record) + '\n' for record in records)
+
+        reloaded = Blockchain(difficulty=1, blockchain_dir=chain_file)
+        self.assertEqual([b.current_hash for b in reloaded.chain],
+                         [b.current_hash for b in self.blockchain.chain[:2]])
+        self.assertTrue(reloaded.is_chain_valid())
+
+    def test_get_blocks_by_content(self):
+        """Test exact content lookups through the lazily built content index."""
+        block = Block(
+            index=1,
+            previous_hash=self.blockchain.get_latest_block().current_hash,
+            timestamp=int(time.time()),
+            data={'title': 'Doc', 'page': 0, 'content': 'Some page  text.'},
+            signature='sig'
+        )
+        self.blockchain.chain.append(block)
+
+        # Lookups normalize whitespace and case like find_text_matches does
+        self.assertEqual(self.blockchain.get_blocks_by_content(' some PAGE text. '), [block])
+        self.assertEqual(self.blockchain.get_blocks_by_content('Other text.'), [])
+
+        # Replacing the chain invalidates the index
+        self.blockchain.chain = self.blockchain.chain[:1]
+        self.assertEqual(self.blockchain.get_blocks_by_content('Some page text.'), [])
+
     def test_tampered_chain_detection(self):
         """Test if tampering with a block invalidates the chain."""
         # Add a valid block first
@@ -124,6 +266,61 @@ class TestBlockchain(unittest.TestCase):
         self.assertEqual(len(self.blockchain.chain), 1)
         self.assertTrue(self.blockchain._is_genesis_block_valid(self.blockchain.chain[0]))
 
+    def test_in_place_tampering_detection(self):
+        """Test that mutating block data in place fails validation despite the hash memo."""
+        self.test_add_block_and_validation()
+        self.assertTrue(self.blockchain.is_chain_valid())  # Memoizes every block hash
+
+        self.blockchain.chain[1].data['content'] = "Tampered page."
+        self.assertFalse(self.blockchain.is_chain_valid())
+        self.blockchain.chain[1].data['content'] = "This is a test page."
+        self.assertTrue(self.blockchain.is_chain_valid())
+
+        self.blockchain.chain[0].data['message'] = "Tampered Genesis Block"
+        self.assertFalse(self.blockchain.is_chain_valid())
+        self.assertFalse(self.blockchain._is_genesis_block_valid(self.blockchain.chain[0]))
+
+    def test_trusted_revalidation_uses_hash_memo(self):
+        """Test that is_chain_valid(audit=False) revalidates without rehashing unchanged blocks."""
+        self.test_add_block_and_validation()
+        self.assertTrue(self.blockchain.is_chain_valid())
+
+        with patch.object(Block, 'serialize_prefix', autospec=True,
+                          side_effect=Block.serialize_prefix) as serialize_prefix:
+            self.assertTrue(self.blockchain.is_chain_valid(audit=False))
+            self.assertEqual(serialize_prefix.call_count, 0)
+
+            # Reassigning a hashed field still drops the memo
+            self.blockchain.chain[1].data = dict(self.blockchain.chain[1].data, content="Tampered page.")
+            self.assertFalse(self.blockchain.is_chain_valid(audit=False))
+            self.assertEqual(serialize_prefix.call_count, 1)
+
+    def test_bad_signature_truncates_chain(self):
+        """Test that repair cuts the chain at the first block whose signature does not verify."""
+        self.test_add_block_and_validation()
+        signed = self.blockchain.chain[1]
+
+        # Well-formed, mined blocks whose content no longer matches the signature
+        for _ in range(2):
+            previous = self.blockchain.get_latest_block()
+            block = Block(
+                index=previous.index + 1,
+                previous_hash=previous.current_hash,
+                timestamp=int(time.time()),
+                data=dict(signed.data, content="Altered page."),
+                signature=signed.signature
+            )
+            stop_event = MagicMock()
+            stop_event.is_set.return_value = False
+            block.nonce = self.blockchain._proof_of_work(block, stop_event)
+            block.current_hash = block.calculate_hash()
+            self.blockchain.chain.append(block)
+
+        self.assertFalse(self.blockchain.is_chain_valid())
+        self.blockchain.validate_and_repair_chain()
+        self.assertEqual(len(self.blockchain.chain), 2)
+        self.assertTrue(self.blockchain.is_chain_valid())
+
 
 class TestSignatures(unittest.TestCase):
     """Tests for the signature generation and verification logic."""
@@ -147,6 +344,44 @@ class TestSignatures(unittest.TestCase):
         sig3 = generate_dp_page_signature(self.modified_data, self.doc_title, self.page_num)
         self.assertNotEqual(sig1, sig3)
 
+    def test_dp_signature_known_answer(self):
+        """Test that the DP signature scheme matches signatures already stored on chain."""
+        text = "This is the first sentence. This is the second sentence. This is the third sentence."
+        self.assertEqual(
+            generate_dp_page_signature(text, "Test Document", 1),
+            "ea466462c02e806a8cf12d3f3a6bb78bc6a702b678a25364bf69129413eb201e"
+        )
+        self.assertEqual(
+            generate_dp_page_signature("", "Test Document", 2),
+            "d41c4512afa7c1aa467792014761c56a29b8c19f5314de974ba4c274e0c61f36"
+        )
+
+    def test_dp_signature_record_steps(self):
+        """Test that recording the audit steps does not change the signature."""
+        text = "First sentence here. Second one follows! Does a third? Yes."
+        fast = generate_dp_page_signature(text, self.doc_title, self.page_num)
+        recorded = generate_dp_page_signature(text, self.doc_title, self.page_num, record_steps=True)
+        self.assertEqual(fast, recorded)
+        self.assertTrue(all(verify_dp_signature_integrity().values()))
+
+        # The same text on another page or document reuses the cached split
+        # but still gets its own signature
+        for title, page in ((self.doc_title, self.page_num + 1), ("OtherDoc", self.page_num)):
+            repeated = generate_dp_page_signature(text, title, page)
+            self.assertNotEqual(repeated, fast)
+            self.assertEqual(repeated, generate_dp_page_signature(text, title, page, record_steps=True))
+
+    def test_dp_signers_released_with_their_threads(self):
+        """Test that per-thread DP signers are freed once their worker threads exit."""
+        def sign_page(page_number):
+            generate_dp_page_signature(f"Worker page {page_number}. Second sentence.", self.doc_title, page_number)
+            return weakref.ref(_get_signer())
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            signer_refs = list(pool.map(sign_page, range(1, 17)))
+        gc.collect()
+        self.assertTrue(all(ref() is None for ref in signer_refs))
+
     def test_sign_and_verify_success(self):
         """Test successful signing and verification."""
         dp_hash = generate_dp_page_signature(self.test_data, self.doc_title, self.page_num)
@@ -162,6 +397,18 @@ class TestSignatures(unittest.TestCase):
         self.assertFalse(verify_signature(wrong_dp_hash, signature, self.public_key))
 
 
+    def test_verify_signature_pem(self):
+        """Test the memoized PEM verification path agrees with verify_signature."""
+        public_key_pem = self.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode('utf-8')
+        dp_hash = generate_dp_page_signature(self.test_data, self.doc_title, self.page_num)
+        signature = sign_data(dp_hash, self.private_key)
+        self.assertTrue(verify_signature_pem(dp_hash, signature, public_key_pem))
+        self.assertTrue(verify_signature_pem(dp_hash, signature, public_key_pem))
+        self.assertFalse(verify_signature_pem(dp_hash[::-1], signature, public_key_pem))
+
 class TestTextMatcher(unittest.TestCase):
     """Tests for the text matching and similarity logic."""
 
@@ -195,6 +442,21 @@ class TestTextMatcher(unittest.TestCase):
         self.assertEqual(match_type, 'different')
         self.assertLess(similarity, 40.0)
 
+    def test_similarity_upper_bound(self):
+        """Test that the cheap bound never underestimates find_text_matches similarity."""
+        texts = [
+            "The quick brown fox jumps over the lazy dog.",
+            "The quick brown fox jumps over the very lazy dog.",
+            "A slow brown fox is not a quick creature.",
+            "Hello world, this is a test sentence.",
+            "",
+        ]
+        for original in texts:
+            for modified in texts:
+                _, similarity, _ = find_text_matches(original, modified)
+                bound = similarity_upper_bound(char_profile(original), char_profile(modified))
+                self.assertGreaterEqual(bound, similarity)
+
 # --- Test Runner ---
 if __name__ == '__main__':
     unittest.main(verbosity=3)
\ No newline at end of file
@@ -1,14 +1,18 @@
-# Text Comparison using KMP Algorithm for document validation and similarity detection
+# Text comparison for document validation and similarity detection
 
 import difflib
+from collections import Counter
 from typing import List, Tuple, Dict, Any
 
+# Largest amount find_text_matches adds to the difflib ratio for pattern matches
+MAX_PATTERN_BOOST = 4
+
 def find_text_matches(
     original: str, 
     modified: str
 ) -> Tuple[str, float, List[Dict[str, Any]]]:
     """
-    Compare two texts using KMP and determine if they are:
+    Compare two texts and determine if they are:
     1. Exact match
     2. Modified version
     3. Similar document
@@ -23,41 +27,17 @@ def find_text_matches(
     - similarity: percentage of similarity (0-100)
     - matches: list of matching segments with their positions
     """
-    def build_kmp_table(pattern: str) -> List[int]:
-        """Build failure function table for KMP algorithm"""
-        table: List[int] = [0] * len(pattern)
-        j = 0
-        
-        for i in range(1, len(pattern)):
-            while j > 0 and pattern[i] != pattern[j]:
-                j = table[j - 1]
-            
-            if pattern[i] == pattern[j]:
-                j += 1
-            
-            table[i] = j
-        
-        return table
-
-    def kmp_search(text: str, pattern: str) -> List[int]:
-        """KMP string search algorithm"""
+    def find_occurrences(text: str, pattern: str) -> List[int]:
+        """Start positions of every (possibly overlapping) occurrence of pattern in text"""
         if not pattern:
             return []
-        
-        failure_table = build_kmp_table(pattern)
+
+        # str.find runs the search in C, far ahead of a KMP loop in Python
         matches = []
-        j = 0  # pattern index
-        for i in range(len(text)):
-            while j > 0 and text[i] != pattern[j]:
-                j = failure_table[j - 1]
-            
-            if text[i] == pattern[j]:
-                j += 1
-            
-            if j == len(pattern):
-                matches.append(i - j + 1)
-                j = failure_table[j - 1]
-        
+        pos = text.find(pattern)
+        while pos >= 0:
+            matches.append(pos)
+            pos = text.find(pattern, pos + 1)
         return matches
 
     def find_common_substrings(
@@ -66,16 +46,21 @@ def find_text_matches(
         """Find common substrings using the selected algorithm"""
         common_matches: List[Dict[str, Any]] = []
         words1 = text1.split()
+        # Lowercase once up front rather than for every word and phrase searched
+        text1_lower = text1.lower()
+        text2_lower = text2.lower()
         
         # Check individual words first
         for word in words1:
             if len(word) >= 4:
-                positions = kmp_search(text2.lower(), word.lower())
+                word_lower = word.lower()
+                positions = find_occurrences(text2_lower, word_lower)
                 if positions:
+                    text1_pos = text1_lower.find(word_lower)
                     for pos in positions:
                         common_matches.append({
                             'pattern': word,
-                            'text1_pos': text1.lower().find(word.lower()),
+                            'text1_pos': text1_pos,
                             'text2_pos': pos,
                             'length': len(word),
                             'type': 'word'
@@ -86,12 +71,14 @@ def find_text_matches(
             for phrase_len in range(2, min(6, len(words1) - i + 1)):
                 phrase = ' '.join(words1[i:i + phrase_len])
                 if len(phrase) >= min_length:
-                    positions = kmp_search(text2.lower(), phrase.lower())
+                    phrase_lower = phrase.lower()
+                    positions = find_occurrences(text2_lower, phrase_lower)
                     if positions:
+                        text1_pos = text1_lower.find(phrase_lower)
                         for pos in positions:
                             common_matches.append({
                                 'pattern': phrase,
-                                'text1_pos': text1.lower().find(phrase.lower()),
+                                'text1_pos': text1_pos,
                                 'text2_pos': pos,
                                 'length': len(phrase),
                                 'type': 'phrase'
@@ -136,7 +123,7 @@ def find_text_matches(
         total_matched_chars = sum(match['length'] for match in matches)
         max_length = max(len(original_clean), len(modified_clean))
         # FIX: Reduced the pattern boost cap and multiplier to be less aggressive.
-        pattern_boost = min(4, (total_matched_chars / max_length) * 25)
+        pattern_boost = min(MAX_PATTERN_BOOST, (total_matched_chars / max_length) * 25)
         similarity = min(100, base_similarity + pattern_boost)
     else:
         similarity = base_similarity
@@ -152,6 +139,28 @@ def find_text_matches(
         return ('different', similarity, matches)
 
 
+def char_profile(text: str) -> Counter:
+    """
+    Character counts of `text` as find_text_matches compares it (whitespace
+    normalized, lowercased). Used with similarity_upper_bound.
+    """
+    return Counter(' '.join(text.split()).lower())
+
+
+def similarity_upper_bound(profile1: Counter, profile2: Counter) -> float:
+    """
+    Cheap upper bound on the similarity find_text_matches would report for two
+    texts, given their char_profile()s. The difflib ratio can never exceed
+    the share of characters the texts have in common, so a pair whose bound
+    is below a threshold can be rejected without running the full comparison.
+    """
+    total = sum(profile1.values()) + sum(profile2.values())
+    if not total:
+        return 100.0
+    common = sum((profile1 & profile2).values())
+    return min(100, (2.0 * common / total) * 100 + MAX_PATTERN_BOOST)
+
+
 def separate_sentences(text: str) -> List[str]:
     """
     Split `text` into individual sentences.